@@ -3,11 +3,15 @@ class ActorContainer:
         self.actor = None 
         self.id: int = -1
         self.name: str = ""
+        self.listname: str = ""
         self.position: list = [0, 0, 0]
         self.rotation: list = [0, 0, 0, 0]
         self.metadata: str = ""
         self.instance: int = 9
+        self.visible: bool = False
+        self.user_matrix = None  # persistent vtkMatrix4x4 bound to the actor
 
 class DebugContainer:
     def __init__(self):
-        self.actor = None 
\ No newline at end of file
+        self.actor = None
+        self.transform = None
\ No newline at end of file
@@ -1,4 +1,17 @@
-from bson import loads
+import os
+
+import numpy as np
+
+try:
+    # pymongo's bson exposes a C-accelerated decode; prefer it when installed
+    from bson import decode as bson_decode
+except ImportError:
+    from bson import loads as bson_decode
+
+from Libraries.Transform import MatrixTransform
+
+# Bump whenever the layout of the parsed sidecar cache changes
+CACHE_VERSION = 2
 
 class ReplayPlayer:
     def __init__(self):
@@ -6,18 +19,184 @@ class ReplayPlayer:
         self.frames: list = None
         self.current_frame: int = 0
         self.number_of_frames: int = 0
+        self.id_to_idx: dict = {}
+        self.positions = None  # (F, N, 3) float32
+        self.rotations = None  # (F, N, 4) float32
+        self.matrices = None   # (F, N, 4, 4) float64
+        self.dynamic_mask = None  # (F, N) bool: pose differs from previous frame
         self.is_playing: bool = False
         self.speed: float = 1.0
         self.direction: int = 1  # 1 = forward, -1 = backward
 
     def load_replay(self, filepath):
-        with open(filepath, 'rb') as f:
-            data = loads(f.read()) 
+        self.current_frame = 0
+
+        if self.load_cache(filepath):
+            return
+
+        # Replays are one top-level BSON document, so document-by-document
+        # streaming does not apply; a large read buffer still helps the
+        # sequential slurp on big files
+        with open(filepath, 'rb', buffering=65536) as f:
+            data = bson_decode(f.read())
 
             self.frames = data.get("frames", [])
             self.objects = data.get("objects", [])
-        self.current_frame = 0
         self.number_of_frames = len(self.frames)
+        self.build_state_tensors()
+        self.save_cache(filepath)
+
+    def load_cache(self, filepath):
+        """Loads the pre-parsed sidecar cache if it is newer than the
+        source replay; returns True on success."""
+        cache_path = filepath + ".cache.npz"
+        # A corrupt or truncated cache must never make the replay itself
+        # unopenable, so any failure here just falls back to the BSON path
+        try:
+            if os.path.getmtime(cache_path) < os.path.getmtime(filepath):
+                return False
+            data = np.load(cache_path, allow_pickle=True)
+
+            if "version" not in data.files or int(data["version"]) != CACHE_VERSION:
+                return False
+
+            self.frames = list(data["frames"])
+            self.objects = list(data["objects"])
+            self.positions = data["positions"]
+            self.rotations = data["rotations"]
+        except Exception:
+            return False
+        self.id_to_idx = {geom["id"]: i for i, geom in enumerate(self.objects)}
+        self.matrices = MatrixTransform.build_matrix_batch(self.rotations, self.positions)
+        self.build_dynamic_mask()
+        self.number_of_frames = len(self.frames)
+        return True
+
+    def build_dynamic_mask(self):
+        """Marks which objects actually moved between consecutive frames;
+        sequential playback skips the matrix copy for the static rest."""
+        frame_count, object_count = self.positions.shape[:2]
+        self.dynamic_mask = np.ones((frame_count, object_count), dtype=bool)
+        if frame_count > 1:
+            self.dynamic_mask[1:] = ((self.positions[1:] != self.positions[:-1]).any(axis=2)
+                                     | (self.rotations[1:] != self.rotations[:-1]).any(axis=2))
+
+    def save_cache(self, filepath):
+        """Writes the parsed frames and pose tensors next to the source so
+        subsequent opens skip BSON decoding entirely."""
+        frames_arr = np.empty(len(self.frames), dtype=object)
+        frames_arr[:] = self.frames
+        objects_arr = np.empty(len(self.objects), dtype=object)
+        objects_arr[:] = self.objects
+        # Write to a temp file and rename so an interrupted save never
+        # leaves a half-written cache at the final path
+        cache_path = filepath + ".cache.npz"
+        tmp_path = cache_path + ".tmp"
+        try:
+            # np.savez appends .npz to bare paths, so hand it a file object
+            with open(tmp_path, 'wb') as f:
+                np.savez(f,
+                         version=np.int32(CACHE_VERSION),
+                         frames=frames_arr,
+                         objects=objects_arr,
+                         positions=self.positions,
+                         rotations=self.rotations)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass
+
+    def build_state_tensors(self):
+        """Packs the per-frame object states into contiguous SoA tensors.
+
+        positions and rotations are indexed by [frame, object index] and
+        id_to_idx maps a replay object id to its object index. Objects
+        missing from a frame default to the origin/identity pose."""
+        self.id_to_idx = {geom["id"]: i for i, geom in enumerate(self.objects)}
+
+        frame_count = len(self.frames)
+        object_count = len(self.objects)
+        self.positions = np.zeros((frame_count, object_count, 3), dtype=np.float32)
+        self.rotations = np.tile(np.array([0, 0, 0, 1], dtype=np.float32), (frame_count, object_count, 1))
+
+        # Accumulate plain Python lists and convert them in two bulk
+        # passes - one np.asarray amortized over the whole replay instead
+        # of a small array construction per state
+        frame_idx = []
+        obj_idx = []
+        pos_flat = []
+        rot_flat = []
+        for f, frame in enumerate(self.frames):
+            states = frame.get("states", [])
+            idx = np.empty(len(states), dtype=np.int32)
+            visible = np.empty(len(states), dtype=bool)
+            meta = []
+            for k, state in enumerate(states):
+                i = self.id_to_idx[state["id"]]
+                idx[k] = i
+                visible[k] = state["i"] == "i"
+                meta.append(state["m"])
+                frame_idx.append(f)
+                obj_idx.append(i)
+                pos_flat.append(state["p"])
+                rot_flat.append(state["r"])
+
+            # Per-frame SoA views so playback never touches the state dicts
+            frame["state_idx"] = idx
+            frame["state_visible"] = visible
+            frame["state_meta"] = meta
+
+        if frame_idx:
+            frame_idx = np.asarray(frame_idx, dtype=np.int32)
+            obj_idx = np.asarray(obj_idx, dtype=np.int32)
+            self.positions[frame_idx, obj_idx] = np.asarray(pos_flat, dtype=np.float32)
+            self.rotations[frame_idx, obj_idx] = np.asarray(rot_flat, dtype=np.float32)
+
+        self.matrices = MatrixTransform.build_matrix_batch(self.rotations, self.positions)
+        self.build_dynamic_mask()
+
+        # The tensors are now the source of truth for poses; drop the raw
+        # per-state lists so large replays are not held in memory twice
+        for frame in self.frames:
+            for state in frame.get("states", []):
+                state.pop("p", None)
+                state.pop("r", None)
+
+        self.build_command_arrays()
+
+    def build_command_arrays(self):
+        """Splits each frame's debug commands into per-type float32 arrays
+        so playback applies them without per-command dict lookups.
+
+        Layouts: cmd_v/cmd_r (M, 6) origin + direction/end,
+        cmd_s (M, 4) origin + radius,
+        cmd_c (M, 11) origin + quaternion + full extents + opacity."""
+        for frame in self.frames:
+            vectors = []
+            rays = []
+            spheres = []
+            boxes = []
+            for command in frame.get("cmd", []):
+                t = command["t"]
+                if t == "v":
+                    vectors.append([command.get("ox", 0), command.get("oy", 0), command.get("oz", 0),
+                                    command.get("vx", 0), command.get("vy", 1), command.get("vz", 0)])
+                elif t == "r":
+                    rays.append([command.get("ox", 0), command.get("oy", 0), command.get("oz", 0),
+                                 command.get("ex", 0), command.get("ey", 1), command.get("ez", 0)])
+                elif t == "s":
+                    spheres.append([command.get("ox", 0), command.get("oy", 0), command.get("oz", 0),
+                                    command.get("sr", 0)])
+                elif t == "c":
+                    boxes.append([command.get("ox", 0), command.get("oy", 0), command.get("oz", 0),
+                                  command.get("rx", 0), command.get("ry", 0), command.get("rz", 0),
+                                  command.get("rw", 1),
+                                  command.get("sx", 0) * 2, command.get("sy", 0) * 2, command.get("sz", 0) * 2,
+                                  command.get("o", 1)])
+
+            frame["cmd_v"] = np.asarray(vectors, dtype=np.float32).reshape(-1, 6)
+            frame["cmd_r"] = np.asarray(rays, dtype=np.float32).reshape(-1, 6)
+            frame["cmd_s"] = np.asarray(spheres, dtype=np.float32).reshape(-1, 4)
+            frame["cmd_c"] = np.asarray(boxes, dtype=np.float32).reshape(-1, 11)
 
     def get_current_frame_data(self):
         if not self.frames:
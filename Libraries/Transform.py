@@ -1,7 +1,10 @@
+import math
+
 import vtk
-from math import atan2, acos, degrees
 import numpy as np
 
+_RAD2DEG = 180.0 / math.pi
+
 class MatrixTransform:
     @staticmethod
     def set_transform(position: list, rotation: list):
@@ -10,32 +13,67 @@ class MatrixTransform:
         
         angle_rad, axis = MatrixTransform.to_axis_angle(rotation)
         if angle_rad != 0:
-            angle_deg = angle_rad * 57.29578
+            angle_deg = angle_rad * _RAD2DEG
             transform.RotateWXYZ(angle_deg, *axis)
 
         transform.Translate(position)
         return transform
     
-    def set_transform_with_scale(position: list, rotation: list, scale: list):
-        transform = vtk.vtkTransform()
-        transform.PostMultiply()
+    def set_transform_with_scale(position: list, rotation: list, scale: list, transform=None):
+        if transform is None:
+            transform = vtk.vtkTransform()
+            transform.PostMultiply()
+        else:
+            transform.Identity()
 
         if(scale is not None):
             transform.Scale(scale[0], scale[1], scale[2])
         
         angle_rad, axis = MatrixTransform.to_axis_angle(rotation)
         if angle_rad != 0:
-            angle_deg = angle_rad * 57.29578
+            angle_deg = angle_rad * _RAD2DEG
             transform.RotateWXYZ(angle_deg, *axis)
 
         transform.Translate(position)
         return transform
 
     @staticmethod
-    def set_transform_from_vector(position: list, direction: list):
-        transform = vtk.vtkTransform()
-        transform.PostMultiply()
-        
+    def build_matrix_batch(rotations: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Строит матрицы 4x4 из кватернионов (..., 4) и позиций (..., 3)
+        одним broadcast-проходом; замкнутая форма, без тригонометрии."""
+        q = np.asarray(rotations, dtype=np.float64)
+        p = np.asarray(positions, dtype=np.float64)
+
+        qx, qy, qz, qw = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+        n = qx * qx + qy * qy + qz * qz + qw * qw
+        s = np.where(n > 1e-12, 2.0, 0.0) / np.where(n > 1e-12, n, 1.0)
+
+        xx, yy, zz = qx * qx * s, qy * qy * s, qz * qz * s
+        xy, xz, yz = qx * qy * s, qx * qz * s, qy * qz * s
+        wx, wy, wz = qw * qx * s, qw * qy * s, qw * qz * s
+
+        out = np.zeros(q.shape[:-1] + (4, 4), dtype=np.float64)
+        out[..., 0, 0] = 1.0 - (yy + zz)
+        out[..., 0, 1] = xy - wz
+        out[..., 0, 2] = xz + wy
+        out[..., 1, 0] = xy + wz
+        out[..., 1, 1] = 1.0 - (xx + zz)
+        out[..., 1, 2] = yz - wx
+        out[..., 2, 0] = xz - wy
+        out[..., 2, 1] = yz + wx
+        out[..., 2, 2] = 1.0 - (xx + yy)
+        out[..., :3, 3] = p
+        out[..., 3, 3] = 1.0
+        return out
+
+    @staticmethod
+    def set_transform_from_vector(position: list, direction: list, transform=None):
+        if transform is None:
+            transform = vtk.vtkTransform()
+            transform.PostMultiply()
+        else:
+            transform.Identity()
+
         dir_vec = np.array(direction)
         magnitude = np.linalg.norm(dir_vec)
         if magnitude == 0:
@@ -65,11 +103,20 @@ class MatrixTransform:
     @staticmethod
     def to_axis_angle(rotation: list) -> tuple:
         """Конвертирует кватернион в ось и угол (в радианах)."""
-        qx, qy, qz, qw = rotation
-        angle_rad = 2 * atan2((qx**2 + qy**2 + qz**2)**0.5, qw)
-        if angle_rad == 0:
+        angle_rad, axis = MatrixTransform.to_axis_angle_batch(np.asarray(rotation, dtype=np.float64)[None, :])
+        if angle_rad[0] == 0:
             return 0, [1, 0, 0]
-        
-        norm = (qx**2 + qy**2 + qz**2)**0.5
-        axis = [qx / norm, qy / norm, qz / norm]
+        return float(angle_rad[0]), axis[0]
+
+    @staticmethod
+    def to_axis_angle_batch(quats: np.ndarray) -> tuple:
+        """Векторизованная версия to_axis_angle для массива кватернионов формы (..., 4).
+
+        Возвращает (углы в радианах, оси); норма вектора считается один раз."""
+        quats = np.asarray(quats)
+        s2 = np.einsum('...i,...i->...', quats[..., :3], quats[..., :3])
+        s = np.sqrt(s2)
+        angle_rad = 2.0 * np.arctan2(s, quats[..., 3])
+        inv = np.where(s > 1e-8, 1.0, 0.0) / np.where(s > 1e-8, s, 1.0)
+        axis = quats[..., :3] * inv[..., None]
         return angle_rad, axis
\ No newline at end of file
@@ -1,12 +1,15 @@
 import sys
+import time
+from functools import lru_cache
 
 
 import numpy as np
 import pyvista as pv
+import vtk
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QListWidget, QPushButton, QSlider, 
                              QLabel, QGroupBox, QFileDialog, QScrollArea)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer, QElapsedTimer, QSignalBlocker
 from pyvistaqt import QtInteractor
 
 from Libraries.GeometryContainer import ActorContainer, DebugContainer
@@ -19,19 +22,57 @@ if sys.platform == "linux":
 elif sys.platform == "win32":
     os.environ["QT_QPA_PLATFORM"] = "windows"
 
+@lru_cache(maxsize=32)
+def build_convex_hull(vertex_key):
+    """Triangulates a convex hull from a hashable vertex tuple; cached so
+    reopening a replay does not rerun delaunay_3d."""
+    points = pv.PolyData(np.asarray(vertex_key, dtype=float))
+    return points.delaunay_3d().extract_surface()
+
 print("Matrix-SMT-Visual-Debugger")
 print("Current QT platform:", os.environ.get("QT_QPA_PLATFORM"))
 print("Available QT plugins:", QApplication.libraryPaths())
 
 class MainWindow(QMainWindow):
+    # Number of debug primitives of each kind kept ready per frame
+    MAX_DEBUG_ITEMS = 50
+
+    # Property panel template, formatted in one pass per selection change
+    PROPS_FMT = ("Name: {name}\n"
+                 "ID: {id}\n"
+                 "Position: \n"
+                 "x: {px:.5g}\n"
+                 "y: {py:.5g}\n"
+                 "z: {pz:.5g}\n"
+                 "Rotation: \n"
+                 "rx: {rx:.5g}\n"
+                 "ry: {ry:.5g}\n"
+                 "rz: {rz:.5g}\n"
+                 "rw: {rw:.5g}\n"
+                 "Visibility: {visibility}\n"
+                 "Meta-data: {metadata}")
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Matrix-SMT Visual Debugger")
         self.setGeometry(100, 100, 1280, 720)
 
-        self.geometry: dict = {}
-
-        self.vectors: list = []
+        self.containers: list = []  # aligned with player object indices
+        self._mesh_cache: dict = {}  # (type, dimensions) -> shared polydata
+        self._mapper_cache: dict = {}  # (type, dimensions) -> shared mapper
+        self._scene_signature = None  # shape of the scene currently on screen
+        self._last_props_text = ""
+        self._last_label_update = 0.0
+        self._last_label_text = ""
+        self.geometry_by_listname: dict = {}  # list item text -> ActorContainer
+
+        # Debug vectors are drawn as one glyph batch: per-slot origin and
+        # direction arrays feeding a single vtkGlyph3D arrow actor. Slots
+        # with a zero direction scale to nothing and stay invisible.
+        self.vector_points = np.zeros((self.MAX_DEBUG_ITEMS, 3), dtype=np.float32)
+        self.vector_dirs = np.zeros((self.MAX_DEBUG_ITEMS, 3), dtype=np.float32)
+        self.vector_polydata = None
+        self.vector_actor = None
         self.current_vector: int = 0
 
         self.rays: list = []
@@ -147,6 +188,8 @@ class MainWindow(QMainWindow):
         self.progress_slider.setMinimum(0)
         self.progress_slider.setMaximum(100)
         self.progress_slider.valueChanged.connect(self.seek_animation)
+        self.progress_slider.sliderPressed.connect(self.on_scrub_start)
+        self.progress_slider.sliderReleased.connect(self.on_scrub_end)
         progress_layout.addWidget(self.progress_slider)
 
         self.frame_label = QLabel("Frame: 0/0 | Time: 0.00s")
@@ -161,11 +204,17 @@ class MainWindow(QMainWindow):
         # Add right panel to main layout
         main_layout.addLayout(right_panel)
 
-        # Animation timer
+        # Animation timer: fixed 16 ms tick; playback speed is applied via
+        # wall-clock time, not by retuning the interval
         self.animation_timer = QTimer()
         self.animation_timer.timeout.connect(self.update_animation)
         self.animation_timer.setInterval(16)
 
+        self._elapsed = QElapsedTimer()
+        self._elapsed.start()
+        self._accum = 0.0
+        self._last_drawn_frame = None
+
         # Add some test objects
         self.add_test_objects()
 
@@ -186,52 +235,43 @@ class MainWindow(QMainWindow):
         """Update the list of objects in the scene."""
         self.object_list.clear()
 
-        for obj in self.geometry.values():
-            if isinstance(obj.actor, pv.Actor):
-                self.object_list.addItem(obj.actor.name)
+        # geometry_by_listname holds exactly the actor-backed containers in
+        # insertion order; one addItems call lets Qt batch the model reset
+        self.object_list.addItems(list(self.geometry_by_listname))
 
     def on_object_selected(self, item):
         """Displays properties of the selected object."""
         obj_name = item.text()
         actor = self.plotter.actors[obj_name]
 
-        container = None
-        for obj in self.geometry.values():
-            if(obj_name == f"{obj.name}: id[{obj.id}]"):
-                container = obj
-                break
+        container = self.geometry_by_listname.get(obj_name)
 
-        
-        properties = {
-            "Name": obj_name,
-            "ID": str(container.id),
-            "Position": "",
-            "x": str(container.position[0]),
-            "y": str(container.position[1]),
-            "z": str(container.position[2]),
-            "Rotation": "",
-            "rx": str(container.rotation[0]),
-            "ry": str(container.rotation[1]),
-            "rz": str(container.rotation[2]),
-            "rw": str(container.rotation[3]),
-            "Visibility": str(actor.visibility),
-            "Meta-data": container.metadata
-        }
-        
-        text = "\n".join(f"{k}: {v}" for k, v in properties.items())
-        self.properties_display.setText(text)
+
+        text = self.PROPS_FMT.format(
+            name=obj_name,
+            id=container.id,
+            px=container.position[0],
+            py=container.position[1],
+            pz=container.position[2],
+            rx=container.rotation[0],
+            ry=container.rotation[1],
+            rz=container.rotation[2],
+            rw=container.rotation[3],
+            visibility=actor.visibility,
+            metadata=container.metadata)
+
+        # setText triggers a relayout; skip it when nothing changed
+        if text != self._last_props_text:
+            self._last_props_text = text
+            self.properties_display.setText(text)
 
     def on_object_double_clicked(self, item):
         self.on_object_selected(item)
 
         obj_name = item.text()
 
-        container = None
-        for obj in self.geometry.values():
-            if(obj_name == f"{obj.name}: id[{obj.id}]"):
-                container = obj
-                break
-                
+        container = self.geometry_by_listname.get(obj_name)
+
         if(container != None):
             self.plotter.camera_position = [
                 (container.position[0], container.position[1] + 15, container.position[2] - 15),
@@ -248,6 +288,7 @@ class MainWindow(QMainWindow):
             self.player.load_replay(filepath)
             self.progress_slider.setMaximum(len(self.player.frames) - 1)
             self.instatiate_geometry()
+            self._last_drawn_frame = None
             self.update_display()
 
     def toggle_play(self):
@@ -255,9 +296,25 @@ class MainWindow(QMainWindow):
         self.player.is_playing = not self.player.is_playing
         self.play_button.setText("Pause" if self.player.is_playing else "Play")
         if self.player.is_playing:
+            # Playback auto-stops on the terminal frame; pressing Play
+            # there means "watch it again", so rewind before starting
+            if (self.player.direction > 0 and self.player.frames
+                    and self.player.current_frame >= self.player.number_of_frames - 1):
+                self.player.current_frame = 0
+            # Let VTK trade quality for speed while frames are flying by,
+            # and restore still-render quality as soon as playback pauses
+            self.plotter.render_window.SetDesiredUpdateRate(60.0)
+            self.plotter.disable_anti_aliasing()
+            self._elapsed.restart()
+            self._accum = 0.0
             self.animation_timer.start()
         else:
+            self.plotter.render_window.SetDesiredUpdateRate(0.0001)
+            self.plotter.enable_anti_aliasing()
             self.animation_timer.stop()
+            # The playback throttle may have skipped the last label
+            # update; sync the readout to the frame on screen
+            self.refresh_frame_label()
             
 
     def toggle_direction(self):
@@ -271,11 +328,31 @@ class MainWindow(QMainWindow):
         self.player.step()
         self.update_display()
 
+    # Seconds of replay time per frame at 1.0x speed (the historical
+    # 100 ms timer interval)
+    FRAME_DT = 0.1
+
     def update_animation(self):
         """Update animation frame automatically."""
-        if self.player.is_playing:
-            self.player.step()
-            self.update_display()
+        if not self.player.is_playing or not self.player.frames:
+            return
+
+        dt = self._elapsed.restart() / 1000.0
+        self._accum += dt * self.player.speed
+        frames_to_advance = int(self._accum / self.FRAME_DT)
+        if frames_to_advance == 0:
+            return
+        self._accum -= frames_to_advance * self.FRAME_DT
+
+        target = self.player.current_frame + self.player.direction * frames_to_advance
+        if self.player.direction > 0 and target >= self.player.number_of_frames - 1:
+            # End of replay: stop on the terminal frame instead of looping
+            # and re-rendering the auto-hidden (blank) scene every tick
+            self.player.current_frame = self.player.number_of_frames - 1
+            self.toggle_play()
+        else:
+            self.player.current_frame = target % self.player.number_of_frames
+        self.update_display()
 
     def update_display(self):
         """Update the scene based on current animation frame."""
@@ -283,132 +360,184 @@ class MainWindow(QMainWindow):
         if not frame_data:
             return
 
-        # Update progress slider
+        # Nothing changed since the last draw (e.g. a redundant slider
+        # signal) - skip the whole update and render
+        if self.player.current_frame == self._last_drawn_frame:
+            return
+        previous_frame = self._last_drawn_frame
+        self._last_drawn_frame = self.player.current_frame
+
+        # Update progress slider; block its valueChanged signal so the
+        # programmatic update does not re-enter via seek_animation
+        blocker = QSignalBlocker(self.progress_slider)
         self.progress_slider.setValue(self.player.current_frame)
+        del blocker
 
-        current_time = round(frame_data.get("t", 0), 5)
-        self.frame_label.setText(f"Frame: {self.player.current_frame}/{self.player.number_of_frames} | Time: {current_time}s")
+        # Updating the label tick-by-tick churns Qt text layout at 60 Hz;
+        # ~10 Hz is plenty during playback. While paused (steps, seeks,
+        # the final stop frame) the readout must always match the scene,
+        # so the throttle only applies to the high-rate playback path
+        now = time.monotonic()
+        if not self.player.is_playing or now - self._last_label_update > 0.1:
+            self.refresh_frame_label()
 
         # Apply transformations to objects
-        states = frame_data.get("states", [])
-        for state in states:
-            actor = self.geometry[state["id"]].actor
-            self.geometry[state["id"]].position = state['p']
-            self.geometry[state["id"]].rotation = state['r']
-
-            if(state["i"] == "i"):
-                actor.visibility = True
-            else:
-                actor.visibility = False
+        frame_index = self.player.current_frame
+        positions = self.player.positions
+        rotations = self.player.rotations
+        matrices = self.player.matrices
+        state_visible = frame_data["state_visible"]
+        state_meta = frame_data["state_meta"]
+
+        # When stepping to an adjacent frame, only bodies flagged in the
+        # dynamic mask moved; a seek invalidates that baseline, so apply all
+        if previous_frame is not None and abs(frame_index - previous_frame) == 1:
+            dynamic = self.player.dynamic_mask[max(frame_index, previous_frame)]
+        else:
+            dynamic = None
+
+        if frame_index == len(self.player.frames) - 1:
+            # The terminal frame hides the whole replay; do it once here
+            # instead of pushing every state through the hidden branch
+            for container in self.containers:
+                if container.visible:
+                    container.actor.visibility = False
+                    container.visible = False
+        else:
+            for k, obj_index in enumerate(frame_data["state_idx"]):
+                container = self.containers[obj_index]
+
+                visible = bool(state_visible[k])
+                force_pose = False
+                if visible != container.visible:
+                    container.actor.visibility = visible
+                    container.visible = visible
+                    # Pose updates were skipped while hidden; refresh on reveal
+                    force_pose = visible
 
-            if(self.player.current_frame == len(self.player.frames) - 1):
-                actor.visibility = False
+                # Hidden bodies contribute nothing to the picture; skip their
+                # pose and metadata updates entirely
+                if not visible:
+                    continue
 
-            self.geometry[state["id"]].metadata = state["m"]
+                container.metadata = state_meta[k]
 
-            position = state['p']
-            rotation = state['r']
+                if not force_pose and dynamic is not None and not dynamic[obj_index]:
+                    continue
 
+                container.position = positions[frame_index, obj_index]
+                container.rotation = rotations[frame_index, obj_index]
 
-            transform = MatrixTransform.set_transform(position, rotation)
-            actor.SetUserTransform(transform)
+                container.user_matrix.DeepCopy(matrices[frame_index, obj_index].ravel())
 
         self.hide_debug_geometry()
 
-        commands = frame_data.get("cmd", [])
-
-        for command in commands:
-            if(command["t"] == "v"):
-                vector = self.vectors[self.current_vector]
-                direction = [command.get("vx", 0), 
-                            command.get("vy", 1), 
-                            command.get("vz", 0)]
-                
-                position = [command.get("ox", 0), command.get("oy", 0), command.get("oz", 0)]
-                transform = MatrixTransform.set_transform_from_vector(position, direction) 
-                vector.actor.SetUserTransform(transform)
-
-                vector.actor.visibility = True
-
-                if(self.current_vector < len(self.vectors) - 1):
-                    self.current_vector += 1
-
-            elif(command["t"] == "r"):
-                ray = self.rays[self.current_ray]
-                end = [command.get("ex", 0), 
-                        command.get("ey", 1), 
-                        command.get("ez", 0)]
-                
-                start = [command.get("ox", 0), command.get("oy", 0), command.get("oz", 0)]
-                transform = MatrixTransform.set_transform_from_vector(start, end) 
-                ray.actor.SetUserTransform(transform)
-
-                ray.actor.visibility = True
-
-                if(self.current_ray < len(self.rays) - 1):
-                    self.current_ray += 1
-
-            elif(command["t"] == "s"):
-                sphere = self.spheres[self.current_sphere]
-                position = [command.get("ox", 0), 
-                        command.get("oy", 0), 
-                        command.get("oz", 0)]
-                
-                radius = command.get("sr", 0)
-                transform = MatrixTransform.set_transform_with_scale(position, [0, 0, 0, 1], [radius, radius, radius]) 
-                sphere.actor.SetUserTransform(transform)
-
-                sphere.actor.visibility = True
-
-                if(self.current_sphere < len(self.spheres) - 1):
-                    self.current_sphere += 1
-
-            elif(command["t"] == "c"):
-                box = self.boxes[self.current_box]
-                
-                position = [command.get("ox", 0), 
-                        command.get("oy", 0), 
-                        command.get("oz", 0)]
-                
-                rotation = [command.get("rx", 0), 
-                        command.get("ry", 0), 
-                        command.get("rz", 0),
-                        command.get("rw", 1)]
-                
-                scale = [command.get("sx", 0) * 2, 
-                        command.get("sy", 0) * 2, 
-                        command.get("sz", 0) * 2]
-                
-                transform = MatrixTransform.set_transform_with_scale(position, rotation, scale) 
-                box.actor.SetUserTransform(transform)
-                
-                box.actor.prop.opacity = command.get("o", 1)
-                box.actor.visibility = True
-
-                if(self.current_box < len(self.boxes) - 1):
-                    self.current_box += 1
+        # Vector commands go to the glyph batch in one slice assignment
+        vector_commands = frame_data["cmd_v"]
+        n_vectors = min(len(vector_commands), self.MAX_DEBUG_ITEMS)
+        if n_vectors:
+            self.vector_points[:n_vectors] = vector_commands[:n_vectors, :3]
+            self.vector_dirs[:n_vectors] = vector_commands[:n_vectors, 3:]
+        self.current_vector = n_vectors
+
+        for row in frame_data["cmd_r"]:
+            ray = self.rays[self.current_ray]
+            MatrixTransform.set_transform_from_vector(row[:3], row[3:], ray.transform)
+
+            ray.actor.visibility = True
+
+            if(self.current_ray < len(self.rays) - 1):
+                self.current_ray += 1
+
+        for row in frame_data["cmd_s"]:
+            sphere = self.spheres[self.current_sphere]
+            radius = row[3]
+            MatrixTransform.set_transform_with_scale(row[:3], [0, 0, 0, 1], [radius, radius, radius], sphere.transform)
+
+            sphere.actor.visibility = True
+
+            if(self.current_sphere < len(self.spheres) - 1):
+                self.current_sphere += 1
+
+        for row in frame_data["cmd_c"]:
+            box = self.boxes[self.current_box]
+            MatrixTransform.set_transform_with_scale(row[:3], row[3:7], row[7:10], box.transform)
+
+            box.actor.prop.opacity = row[10]
+            box.actor.visibility = True
+
+            if(self.current_box < len(self.boxes) - 1):
+                self.current_box += 1
+
+        self.update_vector_glyphs()
 
         self.plotter.render()
 
+    def refresh_frame_label(self):
+        """Sets the frame/time readout from the current frame, bypassing
+        the playback throttle."""
+        frame_data = self.player.get_current_frame_data()
+        if not frame_data:
+            return
+        self._last_label_update = time.monotonic()
+        label_text = f"Frame: {self.player.current_frame}/{self.player.number_of_frames} | Time: {frame_data.get('t', 0):.5f}s"
+        if label_text != self._last_label_text:
+            self._last_label_text = label_text
+            self.frame_label.setText(label_text)
+
     def update_speed(self, value):
         """Update animation speed."""
         self.player.speed = value / 5.0  # Convert 1-10 to 0.2-2.0
         self.speed_label.setText(f"{self.player.speed:.1f}x")
-        self.animation_timer.setInterval(int(100 / self.player.speed))
+
+    def on_scrub_start(self):
+        """Drop anti-aliasing while the user drags the progress slider."""
+        self.plotter.disable_anti_aliasing()
+
+    def on_scrub_end(self):
+        """Restore anti-aliasing after scrubbing (unless still playing)."""
+        if not self.player.is_playing:
+            self.plotter.enable_anti_aliasing()
+            self.plotter.render()
 
     def seek_animation(self, value):
         """Seek to a specific animation frame."""
         self.player.current_frame = value
         self.update_display()
 
+    def get_scene_signature(self):
+        """Hashable description of every replay object's id, name, color
+        and shape - two replays with equal signatures need the same scene."""
+        signature = []
+        for geom in self.player.objects:
+            key = self.get_geometry_key(geom)
+            if key is None:
+                key = ("convex", tuple(tuple(v) for v in geom["vertices"]))
+            signature.append((geom["id"], geom["name"], str(geom["color"]), key))
+        return tuple(signature)
+
     def instatiate_geometry(self):
+        signature = self.get_scene_signature()
+        if signature == self._scene_signature and self.containers:
+            # Same scene as the one already on screen (e.g. the file was
+            # reopened) - keep every actor and just reset playback state
+            for container in self.containers:
+                container.actor.visibility = False
+                container.visible = False
+            self.hide_debug_geometry()
+            self.update_object_list()
+            return
+        self._scene_signature = signature
+
         for actor in self.plotter.actors.values():
             self.plotter.remove_actor(actor)
 
-        self.geometry.clear()
+        self.containers.clear()
+        self.geometry_by_listname.clear()
         origin = ActorContainer()
         origin.id = -1
         origin.name = "origin"
+        origin.listname = f"{origin.name}: id[{origin.id}]"
         origin.position = [0, 0, 0]
         origin.rotation = [0, 0, 0, 1]
 
@@ -424,139 +553,242 @@ class MainWindow(QMainWindow):
             show_edges=True,
             edge_color='gray',
             opacity=0.5,
-            name=f"{origin.name}: id[{origin.id}]"
+            name=origin.listname
         )
 
         origin.actor = plane_actor
 
-        self.geometry[origin.id] = origin
+        self.geometry_by_listname[origin.listname] = origin
         
         for geom in self.player.objects:
             container = ActorContainer()
             container.id = geom["id"]
             container.name = geom["name"]
-            
-            if geom["type"] == "box":
-                mesh = pv.Cube(x_length=geom["half_dimentions"][0] * 2, y_length=geom["half_dimentions"][1] * 2, z_length=geom["half_dimentions"][2] * 2)
-            elif geom["type"] == "sphere":
-                mesh = pv.Sphere(radius=geom["radius"])
-            elif geom["type"] == "capsule":
-                cylinder = pv.Cylinder(
-                    center=(0, 0, 0), 
-                    direction=(1, 0, 0), 
-                    radius=geom["radius"], 
-                    height=geom["half_height"] * 2
-                )
-                sphere1 = pv.Sphere(
-                    radius=geom["radius"], 
-                    center=(geom["half_height"], 0, 0)
-                )
-                sphere2 = pv.Sphere(
-                    radius=geom["radius"], 
-                    center=(-geom["half_height"], 0, 0)
-                )
-                mesh = cylinder + sphere1 + sphere2
-            elif geom["type"] == "convex":
-                vertices = geom["vertices"]
-                points = pv.PolyData(vertices)
-                mesh = points.delaunay_3d().extract_surface()
-
-            actor = self.plotter.add_mesh(
-            mesh,
-            color=geom["color"],
-            smooth_shading=False,
-            reset_camera=False,
-            name=f"{container.name}: id[{container.id}]")
+            container.listname = f"{container.name}: id[{container.id}]"
+
+            mesh = self.get_geometry_mesh(geom)
+
+            actor = self.add_geometry_actor(geom, mesh, container.listname)
             container.actor = actor
 
+            container.user_matrix = vtk.vtkMatrix4x4()
+            actor.SetUserMatrix(container.user_matrix)
+
             actor.visibility = False
-            
-            self.geometry[container.id] = container
+
+            self.containers.append(container)
+            self.geometry_by_listname[container.listname] = container
         
         self.update_object_list()
 
-        self.vectors.clear()
         self.rays.clear()
         self.boxes.clear()
         self.spheres.clear()
 
-        for i in range(0, 50):
-            vector = DebugContainer()
+        self.instatiate_vector_glyphs()
 
-            arrow = pv.Arrow(
-                    start = (0, 0, 0), 
-                    direction = (0, 1, 0), 
-                    tip_length = 0.05,
-                    tip_radius = 0.07,
-                    tip_resolution = 2,
-                    shaft_radius = 0.01,
-                    shaft_resolution = 1,
-            )
+        # One source polydata per primitive kind, shared by every debug
+        # slot; only the per-slot transforms differ
+        line = pv.Line(
+            pointa = (0, 0, 0),
+            pointb = (0, 1, 0),
+            resolution = 1
+        )
 
-            actor = self.plotter.add_mesh(arrow, color='red', opacity=1.0)
-            actor.visibility = False
-            vector.actor = actor
+        sphere_mesh = pv.Sphere(
+                radius = 1,
+                center = (0, 0, 0)
+        )
 
-            self.vectors.append(vector)
-        
-            ray = DebugContainer()
+        box_mesh = pv.Cube(
+                    center = (0, 0, 0),
+                    x_length = 1,
+                    y_length = 1,
+                    z_length = 1,
 
-            line = pv.Line(
-                pointa = (0, 0, 0),
-                pointb = (0, 1, 0),
-                resolution = 1
-            )
+        )
+
+        for i in range(0, self.MAX_DEBUG_ITEMS):
+            ray = DebugContainer()
 
             actor = self.plotter.add_mesh(line, color = "blue")
             actor.visibility = False
             ray.actor = actor
+            ray.transform = vtk.vtkTransform()
+            ray.transform.PostMultiply()
+            actor.SetUserTransform(ray.transform)
 
             self.rays.append(ray)
 
             sphere = DebugContainer()
 
-            sphere_mesh = pv.Sphere(
-                    radius = 1,
-                    center = (0, 0, 0)    
-            )
-            
             actor = self.plotter.add_mesh(sphere_mesh, color='purple')
             actor.visibility = False
             sphere.actor = actor
+            sphere.transform = vtk.vtkTransform()
+            sphere.transform.PostMultiply()
+            actor.SetUserTransform(sphere.transform)
 
             self.spheres.append(sphere)
 
             box = DebugContainer()
 
-            box_mesh = pv.Cube(
-                        center = (0, 0, 0),
-                        x_length = 1,
-                        y_length = 1,
-                        z_length = 1,
-                        
-            )
-            
             actor = self.plotter.add_mesh(box_mesh, color='orange')
             actor.visibility = False
             box.actor = actor
+            box.transform = vtk.vtkTransform()
+            box.transform.PostMultiply()
+            actor.SetUserTransform(box.transform)
 
             self.boxes.append(box)
 
 
+    def instatiate_vector_glyphs(self):
+        """Creates the single glyph actor that draws all debug vectors.
+
+        One arrow polydata is glyphed over MAX_DEBUG_ITEMS points; each
+        glyph is oriented and scaled by its direction vector, so one actor
+        and one draw call replace per-vector actors and transforms."""
+        if self.vector_actor is not None:
+            return
+
+        self.vector_points[:] = 0.0
+        self.vector_dirs[:] = 0.0
+
+        self.vector_polydata = pv.PolyData(self.vector_points)
+        self.vector_polydata["vectors"] = self.vector_dirs
+        self.vector_polydata.GetPointData().SetActiveVectors("vectors")
+
+        arrow = pv.Arrow(
+                start = (0, 0, 0),
+                direction = (0, 1, 0),
+                tip_length = 0.05,
+                tip_radius = 0.07,
+                tip_resolution = 2,
+                shaft_radius = 0.01,
+                shaft_resolution = 1,
+        )
+
+        glyph = vtk.vtkGlyph3D()
+        glyph.SetInputData(self.vector_polydata)
+        glyph.SetSourceData(arrow)
+        glyph.SetVectorModeToUseVector()
+        glyph.SetScaleModeToScaleByVector()
+
+        mapper = vtk.vtkPolyDataMapper()
+        mapper.SetInputConnection(glyph.GetOutputPort())
+
+        actor = vtk.vtkActor()
+        actor.SetMapper(mapper)
+        actor.GetProperty().SetColor(1.0, 0.0, 0.0)
+        self.plotter.renderer.AddActor(actor)
+        self.vector_actor = actor
+
+    def update_vector_glyphs(self):
+        """Pushes the per-slot origin/direction arrays into the glyph input."""
+        self.vector_polydata.points = self.vector_points
+        self.vector_polydata["vectors"] = self.vector_dirs
+        self.vector_polydata.GetPointData().SetActiveVectors("vectors")
+
+    def add_geometry_actor(self, geom, mesh, name):
+        """Adds the actor for a replay object. Objects with the same shape
+        share one mapper, so identical bodies are uploaded to the GPU once
+        and only differ in actor-level transform, color and visibility."""
+        key = self.get_geometry_key(geom)
+        if key is None:
+            return self.plotter.add_mesh(
+                mesh,
+                color=geom["color"],
+                smooth_shading=False,
+                reset_camera=False,
+                name=name)
+
+        mapper = self._mapper_cache.get(key)
+        if mapper is None:
+            mapper = pv.DataSetMapper(mesh)
+            self._mapper_cache[key] = mapper
+
+        actor = pv.Actor(mapper=mapper)
+        actor.prop.color = geom["color"]
+        actor, _ = self.plotter.add_actor(actor, name=name, reset_camera=False)
+        return actor
+
+    def get_geometry_key(self, geom):
+        """Cache key for a replay object's shape, or None when the shape
+        cannot be shared (convex hulls)."""
+        if geom["type"] == "box":
+            return ("box", tuple(geom["half_dimentions"]))
+        elif geom["type"] == "sphere":
+            return ("sphere", geom["radius"])
+        elif geom["type"] == "capsule":
+            return ("capsule", geom["radius"], geom["half_height"])
+        return None
+
+    def get_geometry_mesh(self, geom):
+        """Returns the mesh for a replay object, sharing one polydata
+        between objects of identical type and dimensions. Actors keep
+        independent transforms, so sharing is safe."""
+        key = self.get_geometry_key(geom)
+
+        if key is not None and key in self._mesh_cache:
+            return self._mesh_cache[key]
+
+        if geom["type"] == "box":
+            mesh = pv.Cube(x_length=geom["half_dimentions"][0] * 2, y_length=geom["half_dimentions"][1] * 2, z_length=geom["half_dimentions"][2] * 2)
+        elif geom["type"] == "sphere":
+            mesh = pv.Sphere(radius=geom["radius"])
+        elif geom["type"] == "capsule":
+            if hasattr(pv, "Capsule"):
+                # Single polydata instead of three merged primitives
+                mesh = pv.Capsule(
+                    center=(0, 0, 0),
+                    direction=(1, 0, 0),
+                    radius=geom["radius"],
+                    cylinder_length=geom["half_height"] * 2
+                )
+            else:
+                cylinder = pv.Cylinder(
+                    center=(0, 0, 0),
+                    direction=(1, 0, 0),
+                    radius=geom["radius"],
+                    height=geom["half_height"] * 2
+                )
+                sphere1 = pv.Sphere(
+                    radius=geom["radius"],
+                    center=(geom["half_height"], 0, 0)
+                )
+                sphere2 = pv.Sphere(
+                    radius=geom["radius"],
+                    center=(-geom["half_height"], 0, 0)
+                )
+                mesh = cylinder + sphere1 + sphere2
+                if not isinstance(mesh, pv.PolyData):
+                    mesh = mesh.extract_surface()
+        elif geom["type"] == "convex":
+            mesh = build_convex_hull(tuple(tuple(v) for v in geom["vertices"]))
+
+        if key is not None:
+            self._mesh_cache[key] = mesh
+        return mesh
+
     def hide_debug_geometry(self):
-        for vector in self.vectors:
-            vector.actor.visibility = False
+        """Hides the debug primitives used by the previous frame.
+
+        The current_* counters still hold how far the last frame got, so
+        only that range is touched instead of all MAX_DEBUG_ITEMS slots."""
+        # Zero-length directions scale the vector glyphs to nothing
+        self.vector_dirs[:self.current_vector] = 0.0
         self.current_vector = 0
 
-        for ray in self.rays:
+        for ray in self.rays[:self.current_ray + 1]:
             ray.actor.visibility = False
         self.current_ray = 0
 
-        for sphere in self.spheres:
+        for sphere in self.spheres[:self.current_sphere + 1]:
             sphere.actor.visibility = False
         self.current_sphere = 0
 
-        for box in self.boxes:
+        for box in self.boxes[:self.current_box + 1]:
             box.actor.visibility = False
         self.current_box = 0
 